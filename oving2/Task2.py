@@ -1,3 +1,6 @@
+import numpy as np
+from numba import njit
+
 from Map import Map_Obj
 
 #inspired by https://stackabuse.com/courses/graphs-in-python-theory-and-implementation/lessons/a-star-search-algorithm/
@@ -10,111 +13,126 @@ print(map_array)
 map.set_start_pos_str_marker(start_node,map_array[1])
 map.set_goal_pos_str_marker(stop_node, map_array[1])
 
-# heuristic function, using the manhattan function
-def h(node):
-     posx=node[0]
-     posy=node[1]
-     goalx=stop_node[0]
-     goaly=stop_node[1]
-     return abs(goalx - posx) + abs(goaly - posy)
-
-def get_neighbors(node):
-     x = node[1]
-     y = node[0]
-     all_neighbors = []
-
-     #add all neighbors to the list
-     if x>0:
-          all_neighbors.append([y, x-1])
-     if y>0:
-          all_neighbors.append([y-1, x])
-     if x<38:
-          all_neighbors.append([y, x+1])
-     if y<46:
-          all_neighbors.append([y+1, x])
-
-     walkable_neighbors = []
-     for neighbor in all_neighbors:
-          if map_array[1][neighbor[0]][neighbor[1]] != ' # ':
-               walkable_neighbors.append(neighbor)
-     return walkable_neighbors
+# precompute which cells are walkable once, so the neighbor expansion only
+# does a bool array load instead of a string comparison per cell
+WALK = np.asarray(map_array[1]) != ' # '
+H, W = WALK.shape
+
+# the whole search loop is compiled with Numba: the open list is a manual
+# binary heap of (f << 32 | y*width + x) entries in one preallocated int64
+# array (heapq is not supported inside nopython mode), g/parent/closed are
+# flat grids, and the manhattan heuristic is inlined, so no Python objects
+# are touched inside the loop
+@njit(cache=True)
+def astar_nb(walk, sy, sx, gy, gx):
+    height, width = walk.shape
+    g = np.full(walk.shape, np.iinfo(np.int32).max, np.int32)
+    parent = np.full(walk.shape, -1, np.int32)
+    closed = np.zeros(walk.shape, np.uint8)
+
+    # a cell is pushed at most once per incoming edge, so 4 slots per cell
+    heap = np.empty(height * width * 4, np.int64)
+
+    g[sy, sx] = 0
+    parent[sy, sx] = sy * width + sx
+    heap[0] = np.int64(abs(sy - gy) + abs(sx - gx)) << 32 | (sy * width + sx)
+    size = 1
+
+    while size > 0:
+        # pop the entry with the lowest value of f and sift down
+        top = heap[0]
+        size -= 1
+        heap[0] = heap[size]
+        i = 0
+        while True:
+            left = 2 * i + 1
+            right = left + 1
+            smallest = i
+            if left < size and heap[left] < heap[smallest]:
+                smallest = left
+            if right < size and heap[right] < heap[smallest]:
+                smallest = right
+            if smallest == i:
+                break
+            heap[i], heap[smallest] = heap[smallest], heap[i]
+            i = smallest
+
+        idx = top & 0xFFFFFFFF
+        y = idx // width
+        x = idx % width
+
+        # skip stale heap entries for nodes that were already expanded
+        if closed[y, x]:
+            continue
+        closed[y, x] = 1
+
+        # if the current node is the stop node, we have found a path
+        if y == gy and x == gx:
+            return parent
+
+        for k in range(4):
+            if k == 0:
+                ny, nx = y, x - 1
+            elif k == 1:
+                ny, nx = y - 1, x
+            elif k == 2:
+                ny, nx = y, x + 1
+            else:
+                ny, nx = y + 1, x
+            if ny < 0 or nx < 0 or ny >= height or nx >= width:
+                continue
+            if not walk[ny, nx] or closed[ny, nx]:
+                continue
+
+            new_g = g[y, x] + 1
+            if new_g < g[ny, nx]:
+                g[ny, nx] = new_g
+                parent[ny, nx] = y * width + x
+                f = new_g + abs(ny - gy) + abs(nx - gx)
+
+                # push the entry onto the heap and sift up
+                j = size
+                heap[j] = np.int64(f) << 32 | (ny * width + nx)
+                size += 1
+                while j > 0:
+                    up = (j - 1) // 2
+                    if heap[up] <= heap[j]:
+                        break
+                    heap[j], heap[up] = heap[up], heap[j]
+                    j = up
+
+    return parent
 
 def a_star(start_node, stop_node):
+    sy, sx = start_node
+    gy, gx = stop_node
+
+    parent = astar_nb(WALK, sy, sx, gy, gx)
+
+    if parent[gy, gx] == -1:
+        print("The path does not exist")
+        return None
+
+    # reconstruct the path in Python from the parent grid
+    found_path = []
+    y, x = gy, gx
+    while (y, x) != (sy, sx):
+        found_path.append([y, x])
+        y, x = divmod(int(parent[y, x]), W)
 
-     # the list of nodes that have been visited, but the neighbors haven't all been inspected
-    open_list = [start_node]
-
-    # the list of nodes that have been visited and the neighbors have been inspected
-    closed_list = []
-
-    g = {}
-
-    def make_key(node):
-          x=str(node[1])
-          y=str(node[0])
-          if(len(x)==1):
-               x="0"+x
-          if(len(y)==1):
-               y="0"+y
-          return y+x
-
-    g[make_key(start_node)] = 0
-
-    parents = {}
-    parents[make_key(start_node)] = start_node
-    
-    while len(open_list) > 0:
-          n = None
-
-          # find a node with the lowest value of f
-          for v in open_list:
-               if n == None or g[make_key(v)] + h(v) < g[make_key(n)] + h(n):
-                    n = v
-               if v == stop_node:
-                    n = stop_node
-                    break
-
-          if n == None:
-               print("The path does not exist")
-               return None
-          
-          # if the current node is the stop node, we have found a path
-          if n == stop_node:
-               found_path = []
-
-               while parents[make_key(n)] != n:
-                    found_path.append(n)
-                    n = parents[make_key(n)]
-               
-               found_path.append(start_node)
-
-               found_path.reverse()
-
-               print("Path found: {}".format(found_path))
-               return found_path
-          
-          for neighbor in get_neighbors(n):
-               if neighbor not in open_list and neighbor not in closed_list:
-                    open_list.append(neighbor)
-                    parents[make_key(neighbor)] = n
-                    g[make_key(neighbor)] = g[make_key(n)] + 1
-
-               else:
-                    if g[make_key(neighbor)] > g[make_key(n)] + 1:
-                         g[make_key(neighbor)] = g[make_key(n)] + 1
-                         parents[make_key(neighbor)] = n
-
-          open_list.remove(n)
-          closed_list.append(n)
-          
-    print("The path does not exist")
-    return None
+    found_path.append(start_node)
+
+    found_path.reverse()
+
+    print("Path found: {}".format(found_path))
+    return found_path
 
 path = a_star(start_node, stop_node)
-shortPath = map_array[1]
 
-for n in path:
-     if n!=start_node:
-          shortPath = map.replace_map_values(n, 4, stop_node)
-map_array = map.read_map(path_to_map)
-map.show_map(shortPath)
\ No newline at end of file
+# paint the whole path with one fancy-indexed store per map, instead of
+# one replace_map_values call per node
+path_arr = np.array([n for n in path if n != start_node], dtype=np.int32)
+map.int_map[path_arr[:, 0], path_arr[:, 1]] = 4
+map.str_map[path_arr[:, 0], path_arr[:, 1]] = ' ; '
+map.str_map[stop_node[0], stop_node[1]] = ' G '
+map.show_map()
\ No newline at end of file
@@ -44,8 +44,11 @@ def a_star(start_node, stop_node):
      # the list of nodes that have been visited, but the neighbors haven't all been inspected
     open_list = [start_node]
 
-    # the list of nodes that have been visited and the neighbors have been inspected
-    closed_list = []
+    # set of node keys mirroring open_list, so membership tests are O(1)
+    open_set = {tuple(start_node)}
+
+    # keys of the nodes that have been visited and the neighbors have been inspected
+    closed_set = set()
 
     g = {}
 
@@ -60,16 +63,24 @@ def a_star(start_node, stop_node):
 
     g[make_key(start_node)] = 0
 
+    # memoized f = g + h values, updated whenever g changes, so the
+    # selection loop doesn't recompute the heuristic per comparison
+    f_cache = {}
+    f_cache[make_key(start_node)] = h(start_node)
+
     parents = {}
     parents[make_key(start_node)] = start_node
-    
+
     while len(open_list) > 0:
           n = None
+          best_f = None
 
           # find a node with the lowest value of f
           for v in open_list:
-               if n == None or g[make_key(v)] + h(v) < g[make_key(n)] + h(n):
+               f_v = f_cache[make_key(v)]
+               if n == None or f_v < best_f:
                     n = v
+                    best_f = f_v
                if v == stop_node:
                     n = stop_node
                     break
@@ -82,9 +93,12 @@ def a_star(start_node, stop_node):
           if n == stop_node:
                found_path = []
 
-               while parents[make_key(n)] != n:
+               # cache the key so each step builds it once, not twice
+               key = make_key(n)
+               while parents[key] != n:
                     found_path.append(n)
-                    n = parents[make_key(n)]
+                    n = parents[key]
+                    key = make_key(n)
                
                found_path.append(start_node)
 
@@ -94,18 +108,23 @@ def a_star(start_node, stop_node):
                return found_path
           
           for neighbor in get_neighbors(n):
-               if neighbor not in open_list and neighbor not in closed_list:
+               neighbor_key = tuple(neighbor)
+               if neighbor_key not in open_set and neighbor_key not in closed_set:
                     open_list.append(neighbor)
+                    open_set.add(neighbor_key)
                     parents[make_key(neighbor)] = n
                     g[make_key(neighbor)] = g[make_key(n)] + map.get_cell_value(neighbor)
+                    f_cache[make_key(neighbor)] = g[make_key(neighbor)] + h(neighbor)
 
                else:
                     if g[make_key(neighbor)] > g[make_key(n)] + map.get_cell_value(neighbor):
                          g[make_key(neighbor)] = g[make_key(n)] + map.get_cell_value(neighbor)
+                         f_cache[make_key(neighbor)] = g[make_key(neighbor)] + h(neighbor)
                          parents[make_key(neighbor)] = n
 
           open_list.remove(n)
-          closed_list.append(n)
+          open_set.discard(tuple(n))
+          closed_set.add(tuple(n))
           
     print("The path does not exist")
     return None
@@ -1,7 +1,10 @@
-import copy
+import operator
+from collections import deque
 from itertools import product as prod
 from typing import Any
 
+import numpy as np
+
 class CSP:
     def __init__(self):
         # self.variables is a list of the variable names in the CSP
@@ -20,6 +23,18 @@ class CSP:
         # backtrack failure counter
         self.backtrack_failure_counter = 0
 
+        # trail of (variable, removed value) pairs, used to undo domain
+        # pruning when a branch of the search fails
+        self.trail = []
+
+        # pruning strategy used after each assignment during the search:
+        # 'fc' for forward checking, 'ac3' for a full AC-3 propagation
+        self.pruning = 'fc'
+
+        # cached results of get_all_neighboring_arcs, invalidated when
+        # a constraint is added for the variable
+        self._neighbor_arcs = {}
+
     def add_variable(self, name: str, domain: list):
         """Add a new variable to the CSP.
 
@@ -78,11 +93,16 @@ class CSP:
         list[tuple]
             A list of all arcs/constraints in which `var` is involved
         """
-        return [(i, var) for i in self.constraints[var]]
+        # inference asks for the same arc lists thousands of times, so
+        # build each list once and reuse it
+        if var not in self._neighbor_arcs:
+            self._neighbor_arcs[var] = [(i, var) for i in self.constraints[var]]
+        return self._neighbor_arcs[var]
 
     def add_constraint_one_way(self, i: str, j: str, constraint_function: callable):
         if j not in self.constraints[i]:
             self.constraints[i][j] = constraint_function
+            self._neighbor_arcs.pop(i, None)
 
     def add_all_different_constraint(self, var_list: list):
          """Add an Alldiff constraint between all of the variables in the
@@ -95,17 +115,21 @@ class CSP:
         """
          for (i, j) in self.get_all_possible_pairs(var_list, var_list):
             if i != j:
-                self.add_constraint_one_way(i, j, lambda x, y: x != y)
+                # share one function object instead of a fresh lambda per pair
+                self.add_constraint_one_way(i, j, operator.ne)
 
     def backtracking_search(self):
         """This functions starts the CSP solver and returns the found
         solution.
         """
-        # Make a so-called "deep copy" of the dictionary containing the
-        # domains of the CSP variables. The deep copy is required to
-        # ensure that any changes made to 'assignment' does not have any
-        # side effects elsewhere.
-        assignment = copy.deepcopy(self.domains)
+        # Copy the domain lists so that any changes made to 'assignment'
+        # do not have any side effects on self.domains. The values are
+        # plain strings, so copying each list is enough — no need for
+        # copy.deepcopy walking the whole structure with a memo dict.
+        assignment = {var: values[:] for var, values in self.domains.items()}
+
+        # Start from a clean trail
+        self.trail = []
 
         # Run AC-3 on all constraints in the CSP, to weed out all of the
         # values that are not arc-consistent to begin with
@@ -131,12 +155,13 @@ class CSP:
         the AC-3 algorithm, the lists of legal values in 'assignment'
         should get reduced as AC-3 discovers illegal values.
 
-        IMPORTANT: For every iteration of the for-loop in the
-        pseudocode, you need to make a deep copy of 'assignment' into a
-        new variable before changing it. Every iteration of the for-loop
-        should have a clean slate and not see any traces of the old
-        assignments and inferences that took place in previous
-        iterations of the loop.
+        IMPORTANT: Every iteration of the for-loop should have a clean
+        slate and not see any traces of the old assignments and
+        inferences that took place in previous iterations of the loop.
+        Instead of deep copying 'assignment' per iteration, every value
+        removed from a domain is recorded on self.trail, and a failed
+        iteration pops the trail back to its savepoint to restore the
+        domains it pruned.
         """
         # Increment backtrack counter
         self.backtrack_counter += 1
@@ -150,14 +175,32 @@ class CSP:
 
         # Try all values for the variable
         for value in assignment[var]:
-            new_assignment = copy.deepcopy(assignment)
-            new_assignment[var] = [value]
+            # Savepoint on the trail, so this iteration can be undone
+            mark = len(self.trail)
+
+            # Collapse the domain to the tried value, recording the
+            # values that were removed by doing so
+            for other in assignment[var]:
+                if other != value:
+                    self.trail.append((var, other))
+            assignment[var] = [value]
+
             # Check if the assignment is consistent
-            if self.inference(new_assignment, self.get_all_neighboring_arcs(var)):
-                result = self.backtrack(new_assignment)
+            if self.pruning == 'fc':
+                consistent = self.forward_check(assignment, var)
+            else:
+                consistent = self.inference(assignment,
+                                            self.get_all_neighboring_arcs(var))
+            if consistent:
+                result = self.backtrack(assignment)
                 if result is not None:
                     return result
-                
+
+            # Undo all pruning done by this iteration
+            while len(self.trail) > mark:
+                i, x = self.trail.pop()
+                assignment[i].append(x)
+
         # Increment backtrack failure counter
         self.backtrack_failure_counter += 1
         return None
@@ -169,9 +212,39 @@ class CSP:
         of legal values has a length greater than one.
         """
 
-        # Select variable with fewest legal values
+        # Select variable with fewest legal values, breaking ties on the
+        # number of undecided neighbors (degree heuristic) so the search
+        # branches on the most constraining variable first
         unassigned_vars = [var for var in self.variables if len(assignment[var]) > 1]
-        return min(unassigned_vars, key=lambda var: len(assignment[var]))
+
+        def degree(var):
+            return sum(1 for neighbor in self.constraints[var]
+                       if len(assignment[neighbor]) > 1)
+
+        return min(unassigned_vars,
+                   key=lambda var: (len(assignment[var]), -degree(var)))
+
+    def forward_check(self, assignment, var):
+        """One-hop pruning after 'var' has been decided: revise every
+        arc pointing at a neighbor of 'var', chaining on neighbors
+        whose domains collapse to a single value. This avoids the queue
+        churn of a full AC-3 propagation at the cost of weaker pruning.
+        All removals go through revise, so they are recorded on the
+        trail as usual.
+        """
+        queue = [var]
+        while queue:
+            v = queue.pop()
+            for neighbor in self.constraints[v]:
+                # decided neighbors are revised too: a conflicting
+                # singleton gets emptied here, which is how clashes
+                # between two freshly collapsed cells are caught
+                if self.revise(assignment, neighbor, v):
+                    if not assignment[neighbor]:
+                        return False
+                    if len(assignment[neighbor]) == 1:
+                        queue.append(neighbor)
+        return True
 
     def inference(self, assignment, queue):
         """The function 'AC-3' from the pseudocode in the textbook.
@@ -180,9 +253,13 @@ class CSP:
         is the initial queue of arcs that should be visited.
         """
 
+        # A deque makes popping from the front O(1) instead of the O(N)
+        # shift a list.pop(0) does
+        queue = deque(queue)
+
         # Check if there is a value in i's domain that satisfies the constraint
         while queue:
-            i, j = queue.pop(0)
+            i, j = queue.popleft()
             if self.revise(assignment, i, j):
                 # Check if domain is empty
                 if not assignment[i]:
@@ -204,12 +281,40 @@ class CSP:
         between i and j, the value should be deleted from i's list of
         legal values in 'assignment'.
         """
-        # Check if there is a value in i's domain that satisfies the constraint
+        # An empty domain has nothing left to prune; the failure was
+        # already reported when its last value was removed. Note that a
+        # *singleton* domain must still be revised: emptying it is how
+        # conflicts between two decided variables are detected
+        if not assignment[i]:
+            return False
+
+        constraint = self.constraints[i][j]
+
+        # Fast path for not-equal constraints: a value x only loses its
+        # support in j when j has collapsed to the single value x, so
+        # the whole pairwise check reduces to one membership test
+        if constraint is operator.ne:
+            domain_j = assignment[j]
+            if len(domain_j) == 1 and domain_j[0] in assignment[i]:
+                assignment[i].remove(domain_j[0])
+                self.trail.append((i, domain_j[0]))
+                return True
+            return False
+
+        # Rebuild the domain with the values that still have support in
+        # j's domain, instead of calling the O(N) list.remove while
+        # iterating over the list being mutated
+        domain_j = assignment[j]
+        kept = []
         revised = False
         for x in assignment[i]:
-            if all(not self.constraints[i][j](x, y) for y in assignment[j]):
-                assignment[i].remove(x)
+            if any(constraint(x, y) for y in domain_j):
+                kept.append(x)
+            else:
+                self.trail.append((i, x))
                 revised = True
+        if revised:
+            assignment[i][:] = kept
         return revised
     
     def get_backtrack_counter(self):
@@ -232,8 +337,8 @@ def create_map_coloring_csp():
         csp.add_variable(state, colors)
     for state, other_states in edges.items():
         for other_state in other_states:
-            csp.add_constraint_one_way(state, other_state, lambda i, j: i != j)
-            csp.add_constraint_one_way(other_state, state, lambda i, j: i != j)
+            csp.add_constraint_one_way(state, other_state, operator.ne)
+            csp.add_constraint_one_way(other_state, state, operator.ne)
     return csp
 
 def create_sudoku_csp(filename: str) -> CSP:
@@ -261,20 +366,155 @@ def create_sudoku_csp(filename: str) -> CSP:
             else:
                 csp.add_variable('%d-%d' % (row, col), [board[row][col]])
 
+    # Each cell has exactly 20 distinct peers (8 in the row, 8 in the
+    # column and 4 more in the box). Adding the x != y constraint per
+    # peer covers the row, column and box AllDiffs in a single pass,
+    # instead of three overlapping AllDiff products that mostly hit the
+    # already-added guard
     for row in range(9):
-        csp.add_all_different_constraint(['%d-%d' % (row, col) for col in range(9)])
-    for col in range(9):
-        csp.add_all_different_constraint(['%d-%d' % (row, col) for row in range(9)])
-    for box_row in range(3):
-        for box_col in range(3):
-            cells = []
-            for row in range(box_row * 3, (box_row + 1) * 3):
-                for col in range(box_col * 3, (box_col + 1) * 3):
-                    cells.append('%d-%d' % (row, col))
-            csp.add_all_different_constraint(cells)
+        for col in range(9):
+            var = '%d-%d' % (row, col)
+            for (peer_row, peer_col) in PEERS[(row, col)]:
+                csp.add_constraint_one_way(var, '%d-%d' % (peer_row, peer_col),
+                                           operator.ne)
 
     return csp
 
+def sudoku_cell_peers(row: int, col: int) -> set[tuple]:
+    """Get the set of the 20 cells that share a row, column or box with
+    the cell at (row, col).
+
+    Parameters
+    ----------
+    row : int
+        Row of the cell
+    col : int
+        Column of the cell
+
+    Returns
+    -------
+    set[tuple]
+        A set of (row, col) tuples for the peers of the cell
+    """
+    peers = set()
+    for k in range(9):
+        peers.add((row, k))
+        peers.add((k, col))
+    box_row, box_col = 3 * (row // 3), 3 * (col // 3)
+    for r in range(box_row, box_row + 3):
+        for c in range(box_col, box_col + 3):
+            peers.add((r, c))
+    peers.discard((row, col))
+    return peers
+
+# bits 1..9 of an int encode which digits are still possible for a cell,
+# so a whole Sudoku domain fits in a single machine word
+ALL_DIGITS = 0b1111111110
+
+# the 20 peers of every cell, precomputed once
+PEERS = {(row, col): tuple(sudoku_cell_peers(row, col))
+         for row in range(9) for col in range(9)}
+
+# flat cell indices of the 27 AllDiff groups (9 rows, 9 columns, 9 boxes)
+GROUPS = np.array(
+    [[9 * row + col for col in range(9)] for row in range(9)] +
+    [[9 * row + col for row in range(9)] for col in range(9)] +
+    [[9 * (3 * box_row + r) + 3 * box_col + c
+      for r in range(3) for c in range(3)]
+     for box_row in range(3) for box_col in range(3)])
+
+def create_sudoku_bitmask(filename: str) -> np.ndarray:
+    """Read the Sudoku board in the text file named 'filename' into
+    bitmask domains.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the Sudoku board to solve
+
+    Returns
+    -------
+    np.ndarray
+        A (9, 9) uint16 array of digit bitmasks
+    """
+    board = list(map(lambda x: x.strip(), open(filename, 'rt')))
+    domains = np.full((9, 9), ALL_DIGITS, np.uint16)
+    for row in range(9):
+        for col in range(9):
+            if board[row][col] != '0':
+                domains[row, col] = 1 << int(board[row][col])
+    return domains
+
+def sudoku_propagate(domains: np.ndarray) -> bool:
+    """Vectorized AllDiff propagation over the whole board at once.
+
+    For each of the 27 groups, the digits of its decided cells are
+    OR-ed together and cleared from the group's undecided cells, and
+    this repeats until a fixed point. Returns False if a domain empties
+    or a group has the same digit decided twice, True otherwise.
+    """
+    flat = domains.ravel()
+    while True:
+        groups = flat[GROUPS]
+        decided = np.where((groups & (groups - 1)) == 0, groups, 0)
+        masks = np.bitwise_or.reduce(decided, axis=1)
+
+        # if two decided cells in a group share a digit, the OR has
+        # fewer bits set than there are decided cells
+        if np.any(np.bitwise_count(masks) != np.count_nonzero(decided, axis=1)):
+            return False
+
+        # each cell clears every digit decided in any of its 3 groups
+        clear = np.zeros(81, np.uint16)
+        np.bitwise_or.at(clear, GROUPS.ravel(), np.repeat(masks, 9))
+        new = np.where((flat & (flat - 1)) == 0, flat, flat & ~clear)
+
+        if np.any(new == 0):
+            return False
+        if np.array_equal(new, flat):
+            return True
+        flat[:] = new
+
+def solve_sudoku_bitmask(domains: np.ndarray) -> np.ndarray:
+    """Backtracking search over a (9, 9) uint16 board of bitmask
+    domains.
+
+    The AllDiff constraints reduce to bit operations here: propagation
+    clears decided digits group-wise with vectorized NumPy ops, and a
+    domain holds a single digit exactly when d & (d - 1) == 0. Returns
+    the solved board, or None if it is unsolvable.
+    """
+    if not sudoku_propagate(domains):
+        return None
+
+    flat = domains.ravel()
+
+    # find an undecided cell with the fewest digits left
+    undecided = (flat & (flat - 1)) != 0
+    if not undecided.any():
+        return domains
+    best = int(np.argmin(np.where(undecided, np.bitwise_count(flat), 10)))
+
+    # try the remaining digits of the chosen cell one bit at a time
+    d = int(flat[best])
+    while d:
+        bit = d & -d
+        d &= d - 1
+        branch = domains.copy()
+        branch.ravel()[best] = bit
+        result = solve_sudoku_bitmask(branch)
+        if result is not None:
+            return result
+    return None
+
+def bitmask_solution_to_assignment(domains: np.ndarray) -> dict:
+    """Convert a solved bitmask board into the same representation as
+    CSP.backtracking_search() returns, so that print_sudoku_solution
+    can print it.
+    """
+    return {'%d-%d' % (row, col): [str(int(domains[row, col]).bit_length() - 1)]
+            for row in range(9) for col in range(9)}
+
 def print_sudoku_solution(solution):
     """Convert the representation of a Sudoku solution as returned from
     the method CSP.backtracking_search(), into a human readable